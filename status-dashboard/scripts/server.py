@@ -1,16 +1,52 @@
 #!/usr/bin/env python3
 """Status Dashboard - Web interface for rasppi-utils."""
 
-import json
+import gzip
+import hashlib
 import os
+import re
 import subprocess
-from datetime import datetime
+import threading
+import time
 from pathlib import Path
 from typing import Optional
 
-from flask import Flask, jsonify, send_from_directory
+import orjson
+from flask import Flask, Response, jsonify, request, send_from_directory
+from flask.json.provider import JSONProvider
+
+# Optional: talk to systemd over DBus instead of forking systemctl, which
+# saves the fork+exec cost per status refresh. pystemd needs the systemd
+# headers to build, so it's not in requirements; without it (or when DBus is
+# unreachable, e.g. during development off the Pi) we fall back to systemctl.
+try:
+    from pystemd.systemd1 import Manager as _SystemdManager
+except ImportError:
+    _SystemdManager = None
+
+class _OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson so jsonify skips the stdlib encoder."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = _OrjsonProvider(app)
+
+# Short-lived caches for the API endpoints so bursts of requests (several
+# browser tabs, rapid refreshes) don't each re-fork systemctl/journalctl.
+# 5 s is well under the dashboard's 30 s auto-refresh interval.
+# Utility names from the URL may only contain alphanumerics and hyphens
+_VALID_UTILITY = re.compile(r"[A-Za-z0-9-]+").fullmatch
+
+CACHE_TTL_SECONDS = 5.0
+_cache_lock = threading.Lock()
+_status_cache = {"ts": 0.0, "body": None, "etag": None}
+_logs_cache: dict[str, tuple[float, bytes]] = {}
 
 # Find the project root (parent of status-dashboard)
 SCRIPT_DIR = Path(__file__).parent.parent.parent
@@ -59,54 +95,145 @@ def get_web_ui(utility: str) -> Optional[dict]:
     return {"scheme": spec["scheme"], "port": port}
 
 
+# Parsed utilities.conf, keyed by mtime so edits are still picked up
+_utilities_cache = {"mtime": -1, "list": []}
+
+
 def get_enabled_utilities() -> list[str]:
-    """Read utilities.conf and return list of enabled utility names."""
-    utilities = []
-    if not UTILITIES_CONF.exists():
-        return utilities
-
-    with open(UTILITIES_CONF) as f:
-        for line in f:
-            # Strip whitespace and skip comments/empty lines
-            line = line.strip()
-            if line and not line.startswith("#"):
-                utilities.append(line)
+    """Read utilities.conf and return list of enabled utility names.
 
+    The parsed list is cached and only re-read when the file's mtime
+    changes, keeping file I/O out of the per-request path.
+    """
+    try:
+        mtime = UTILITIES_CONF.stat().st_mtime_ns
+    except OSError:
+        return []
+
+    if mtime == _utilities_cache["mtime"]:
+        return _utilities_cache["list"]
+
+    # One read, then strip whitespace and drop comments/empty lines
+    utilities = [
+        stripped
+        for line in UTILITIES_CONF.read_text().splitlines()
+        if (stripped := line.strip()) and not stripped.startswith("#")
+    ]
+
+    _utilities_cache["mtime"] = mtime
+    _utilities_cache["list"] = utilities
     return utilities
 
 
-def get_unit_status(unit_name: str) -> dict:
-    """Get status of a systemd unit (service or timer)."""
-    result = {
-        "name": unit_name,
-        "active": "unknown",
-        "enabled": "unknown",
-    }
+# Persistent DBus connection to systemd, created lazily by get_unit_states
+_systemd_manager = None
 
-    try:
-        active_result = subprocess.run(
-            ["systemctl", "is-active", unit_name],
-            capture_output=True,
-            text=True,
-        )
-        result["active"] = active_result.stdout.strip() or "inactive"
-    except Exception:
-        result["active"] = "error"
+
+def _get_unit_states_dbus(unit_names: list[str]) -> dict[str, dict]:
+    """get_unit_states over DBus: one round-trip, no subprocess forks."""
+    global _systemd_manager
+    if _systemd_manager is None:
+        manager = _SystemdManager()
+        manager.load()
+        _systemd_manager = manager
+
+    states = {}
+    # ListUnitsByNames returns (name, description, load_state, active_state,
+    # sub_state, ...) tuples for every requested unit in one call
+    rows = _systemd_manager.Manager.ListUnitsByNames(
+        [name.encode() for name in unit_names]
+    )
+    for row in rows:
+        name = row[0].decode()
+        load_state = row[2].decode()
+        if load_state == "not-found":
+            enabled = "not-found"
+        else:
+            try:
+                enabled = _systemd_manager.Manager.GetUnitFileState(
+                    name.encode()
+                ).decode()
+            except Exception:
+                enabled = "disabled"
+        states[name] = {
+            "active": row[3].decode() or "inactive",
+            "enabled": enabled,
+        }
+    return states
+
+
+def get_unit_states(unit_names: list[str]) -> dict[str, dict]:
+    """Query systemd for the state of many units in one systemctl call.
+
+    Returns a mapping of unit name -> {"active", "enabled"} where the values
+    follow the same vocabulary as `systemctl is-active` / `is-enabled`, with
+    "not-found" for units systemd doesn't know about. Uses the DBus API when
+    pystemd is available; otherwise a single `systemctl show` covers every
+    unit, instead of two forks per unit.
+    """
+    global _systemd_manager
+    states = {}
+    if not unit_names:
+        return states
+
+    if _SystemdManager is not None:
+        try:
+            return _get_unit_states_dbus(unit_names)
+        except Exception:
+            # Drop the connection so the next refresh can reconnect,
+            # and fall through to systemctl for this one
+            _systemd_manager = None
 
     try:
-        enabled_result = subprocess.run(
-            ["systemctl", "is-enabled", unit_name],
-            capture_output=True,
+        result = subprocess.run(
+            [
+                "systemctl", "show",
+                "--property=Id,ActiveState,UnitFileState,LoadState",
+                "--",
+            ] + unit_names,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             text=True,
         )
-        result["enabled"] = enabled_result.stdout.strip() or "disabled"
+        # Output is one key=value block per unit, blocks separated by blank lines
+        for block in result.stdout.strip().split("\n\n"):
+            props = dict(
+                line.split("=", 1) for line in block.splitlines() if "=" in line
+            )
+            name = props.get("Id")
+            if not name:
+                continue
+            if props.get("LoadState") == "not-found":
+                enabled = "not-found"
+            else:
+                enabled = props.get("UnitFileState") or "disabled"
+            states[name] = {
+                "active": props.get("ActiveState") or "inactive",
+                "enabled": enabled,
+            }
     except Exception:
-        result["enabled"] = "error"
+        return {name: {"active": "error", "enabled": "error"} for name in unit_names}
+
+    return states
+
 
-    return result
+def get_unit_status(unit_name: str, states: Optional[dict] = None) -> dict:
+    """Get status of a systemd unit (service or timer).
+
+    If `states` (from get_unit_states) is provided, it's consulted instead of
+    running systemctl again.
+    """
+    if states is None:
+        states = get_unit_states([unit_name])
+    state = states.get(unit_name, {"active": "unknown", "enabled": "unknown"})
+    return {
+        "name": unit_name,
+        "active": state["active"],
+        "enabled": state["enabled"],
+    }
 
 
-def get_utility_status(utility: str) -> dict:
+def get_utility_status(utility: str, states: Optional[dict] = None) -> dict:
     """Get full status for a utility including its services and timers."""
     service_name = f"{utility}.service"
     timer_name = f"{utility}.timer"
@@ -115,13 +242,12 @@ def get_utility_status(utility: str) -> dict:
         "name": utility,
         "enabled": True,
         "web": get_web_ui(utility),
-        "services": [get_unit_status(service_name)],
+        "services": [get_unit_status(service_name, states)],
         "timers": [],
     }
 
-    # Check if timer exists by trying to get its status
-    timer_status = get_unit_status(timer_name)
-    # Only include timer if it's not "not-found"
+    # Only include the timer if the unit actually exists
+    timer_status = get_unit_status(timer_name, states)
     if timer_status["enabled"] not in ("not-found", "error"):
         status["timers"].append(timer_status)
 
@@ -131,45 +257,88 @@ def get_utility_status(utility: str) -> dict:
 def get_all_status() -> dict:
     """Get status of all enabled utilities."""
     utilities = get_enabled_utilities()
+    # One batched systemctl call covering every service and timer
+    units = [f"{u}.service" for u in utilities] + [f"{u}.timer" for u in utilities]
+    states = get_unit_states(units)
     return {
-        "utilities": [get_utility_status(u) for u in utilities]
+        "utilities": [get_utility_status(u, states) for u in utilities]
     }
 
 
+def _iso(timestamp_us: int) -> str:
+    """Format journal microseconds-since-epoch as a local-time ISO string.
+
+    Matches datetime.fromtimestamp(...).isoformat() without allocating a
+    datetime object per log entry.
+    """
+    seconds, us = divmod(timestamp_us, 1_000_000)
+    t = time.localtime(seconds)
+    return (
+        f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+        f"T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}.{us:06d}"
+    )
+
+
+def _append_entry(entries: list, timestamp: str, message: str) -> None:
+    """Append a log entry, coalescing runs of identical messages.
+
+    A service spamming the same warning becomes one entry with a bumped
+    count and an updated last_timestamp instead of N identical rows, which
+    keeps the JSON payload and the browser's DOM work bounded.
+    """
+    if entries and entries[-1]["message"] == message:
+        last = entries[-1]
+        last["count"] += 1
+        last["last_timestamp"] = timestamp
+        return
+    entries.append({
+        "timestamp": timestamp,
+        "last_timestamp": timestamp,
+        "count": 1,
+        "message": message,
+    })
+
+
 def get_logs(utility: str, count: int = 50) -> dict:
     """Get recent logs for a utility from journalctl."""
     service_name = f"{utility}.service"
     entries = []
 
     try:
-        result = subprocess.run(
+        # Pipe rather than capture_output so lines are parsed as they arrive
+        # instead of materializing the whole journal dump in memory first
+        proc = subprocess.Popen(
             [
                 "journalctl",
                 "-u", service_name,
                 "--no-pager",
                 "-n", str(count),
                 "--output=json",
+                # We only read MESSAGE; trusted fields like
+                # __REALTIME_TIMESTAMP are always emitted regardless
+                "--output-fields=MESSAGE",
             ],
-            capture_output=True,
-            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
         )
 
-        # journalctl --output=json outputs one JSON object per line
-        for line in result.stdout.strip().split("\n"):
-            if not line:
+        # journalctl --output=json outputs one JSON object per line; orjson is
+        # a few times faster than the stdlib parser on these small objects
+        for line in proc.stdout:
+            if not line.strip():
                 continue
             try:
-                entry = json.loads(line)
+                entry = orjson.loads(line)
                 # Convert timestamp (microseconds since epoch) to ISO format
                 timestamp_us = int(entry.get("__REALTIME_TIMESTAMP", 0))
-                timestamp = datetime.fromtimestamp(timestamp_us / 1_000_000)
-                entries.append({
-                    "timestamp": timestamp.isoformat(),
-                    "message": entry.get("MESSAGE", ""),
-                })
-            except (json.JSONDecodeError, ValueError):
+                _append_entry(
+                    entries, _iso(timestamp_us), entry.get("MESSAGE", "")
+                )
+            except ValueError:
                 continue
 
+        proc.wait()
+
     except Exception as e:
         return {
             "utility": utility,
@@ -183,6 +352,58 @@ def get_logs(utility: str, count: int = 50) -> dict:
     }
 
 
+def get_all_logs(utilities: list[str], count: int = 50) -> dict:
+    """Get recent logs for several utilities with one journalctl call.
+
+    journalctl accepts repeated -u flags and tags every entry with
+    _SYSTEMD_UNIT, so a single fork covers all utilities; the interleaved
+    entries are bucketed back per utility here.
+    """
+    buckets: dict[str, list] = {u: [] for u in utilities}
+    if not utilities:
+        return {"logs": buckets}
+
+    unit_args = [arg for u in utilities for arg in ("-u", f"{u}.service")]
+
+    try:
+        proc = subprocess.Popen(
+            ["journalctl"] + unit_args + [
+                "--no-pager",
+                "-n", str(count * len(utilities)),
+                "--output=json",
+                "--output-fields=MESSAGE,_SYSTEMD_UNIT",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+        for line in proc.stdout:
+            if not line.strip():
+                continue
+            try:
+                entry = orjson.loads(line)
+                unit = entry.get("_SYSTEMD_UNIT", "")
+                utility = unit[:-len(".service")] if unit.endswith(".service") else unit
+                if utility not in buckets:
+                    continue
+                timestamp_us = int(entry.get("__REALTIME_TIMESTAMP", 0))
+                _append_entry(
+                    buckets[utility], _iso(timestamp_us), entry.get("MESSAGE", "")
+                )
+            except ValueError:
+                continue
+
+        proc.wait()
+
+    except Exception as e:
+        return {
+            "error": str(e),
+            "logs": buckets,
+        }
+
+    return {"logs": buckets}
+
+
 # HTML template for the dashboard
 DASHBOARD_HTML = """<!DOCTYPE html>
 <html lang="en">
@@ -324,6 +545,7 @@ DASHBOARD_HTML = """<!DOCTYPE html>
         .log-entry:last-child { border-bottom: none; }
         .log-time { color: #888; margin-right: 10px; }
         .log-message { color: #ddd; }
+        .log-count { color: #ff9800; margin-left: 8px; font-weight: bold; }
         .no-logs { color: #888; font-style: italic; }
         .last-updated {
             text-align: center;
@@ -481,6 +703,7 @@ DASHBOARD_HTML = """<!DOCTYPE html>
                 <div class="log-entry">
                     <span class="log-time">${new Date(e.timestamp).toLocaleString()}</span>
                     <span class="log-message">${escapeHtml(e.message)}</span>
+                    ${e.count > 1 ? `<span class="log-count">&times; ${e.count}</span>` : ''}
                 </div>
             `).join('');
         }
@@ -508,11 +731,20 @@ DASHBOARD_HTML = """<!DOCTYPE html>
 </html>
 """
 
+# The dashboard shell is static, so encode (and compress) it once at import
+# instead of re-encoding the string on every request
+_HTML_BYTES = DASHBOARD_HTML.encode("utf-8")
+_HTML_GZ = gzip.compress(_HTML_BYTES, 9)
+
 
 @app.route("/")
 def dashboard():
-    """Serve the HTML dashboard."""
-    return DASHBOARD_HTML
+    """Serve the HTML dashboard (gzipped when the client accepts it)."""
+    headers = {"Cache-Control": "public, max-age=300"}
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(_HTML_GZ, mimetype="text/html", headers=headers)
+    return Response(_HTML_BYTES, mimetype="text/html", headers=headers)
 
 
 @app.route("/contests")
@@ -548,24 +780,53 @@ def contest_report(filename: str):
 
 @app.route("/api/status")
 def api_status():
-    """Return JSON status of all utilities."""
-    return jsonify(get_all_status())
+    """Return JSON status of all utilities (cached for a few seconds)."""
+    with _cache_lock:
+        age = time.monotonic() - _status_cache["ts"]
+        if _status_cache["body"] is None or age >= CACHE_TTL_SECONDS:
+            body = orjson.dumps(get_all_status())
+            _status_cache["body"] = body
+            # Computed once per refresh so 304 checks are a string compare
+            _status_cache["etag"] = hashlib.blake2b(body, digest_size=8).hexdigest()
+            _status_cache["ts"] = time.monotonic()
+        body = _status_cache["body"]
+        etag = _status_cache["etag"]
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status=304, headers={"ETag": etag})
+    return Response(body, mimetype="application/json", headers={"ETag": etag})
+
+
+@app.route("/api/logs")
+def api_all_logs():
+    """Return logs for every enabled utility from one journalctl fetch."""
+    with _cache_lock:
+        cached = _logs_cache.get("__all__")
+        if cached is None or time.monotonic() - cached[0] >= CACHE_TTL_SECONDS:
+            body = orjson.dumps(get_all_logs(get_enabled_utilities()))
+            cached = (time.monotonic(), body)
+            _logs_cache["__all__"] = cached
+        body = cached[1]
+    return Response(body, mimetype="application/json")
 
 
 @app.route("/api/logs/<utility>")
 def api_logs(utility: str):
-    """Return JSON logs for a specific utility."""
-    # Basic validation - only allow alphanumeric and hyphens
-    if not all(c.isalnum() or c == "-" for c in utility):
+    """Return JSON logs for a specific utility (cached for a few seconds)."""
+    if not _VALID_UTILITY(utility):
         return jsonify({"error": "Invalid utility name"}), 400
-    return jsonify(get_logs(utility))
+    with _cache_lock:
+        cached = _logs_cache.get(utility)
+        if cached is None or time.monotonic() - cached[0] >= CACHE_TTL_SECONDS:
+            cached = (time.monotonic(), orjson.dumps(get_logs(utility)))
+            _logs_cache[utility] = cached
+        body = cached[1]
+    return Response(body, mimetype="application/json")
 
 
 @app.route("/api/run/<utility>", methods=["POST"])
 def api_run(utility: str):
     """Manually trigger a utility service to run."""
-    # Basic validation - only allow alphanumeric and hyphens
-    if not all(c.isalnum() or c == "-" for c in utility):
+    if not _VALID_UTILITY(utility):
         return jsonify({"error": "Invalid utility name"}), 400
 
     # Verify utility is in the enabled list
@@ -592,10 +853,33 @@ def api_run(utility: str):
 
 
 def main():
-    """Run the Flask development server."""
+    """Run the dashboard under gunicorn (dev server if it's not installed)."""
     port = int(os.environ.get("PORT", 80))
-    # Bind to all interfaces so it's accessible on local network
-    app.run(host="0.0.0.0", port=port)
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        # Bind to all interfaces so it's accessible on local network
+        app.run(host="0.0.0.0", port=port)
+        return
+
+    class StandaloneApplication(BaseApplication):
+        """Embeds gunicorn so the systemd unit keeps exec'ing this script."""
+
+        def load_config(self):
+            # Threaded workers overlap the subprocess waits; keep-alive
+            # outlives the 30 s poll interval so each client reuses one
+            # TCP connection instead of reconnecting every refresh
+            self.cfg.set("bind", f"0.0.0.0:{port}")
+            self.cfg.set("workers", 2)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("threads", 4)
+            self.cfg.set("keepalive", 65)
+
+        def load(self):
+            return app
+
+    StandaloneApplication().run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""WSGI entry point for the status dashboard.
+
+The Werkzeug dev server started by ``main()`` handles one request at a time,
+so every client queues behind whichever request is currently waiting on a
+systemctl/journalctl probe. Point a real WSGI server here to serve clients
+concurrently:
+
+    gunicorn --workers 2 --worker-class gthread --threads 4 \\
+        --bind 0.0.0.0:$PORT scripts.wsgi:app
+"""
+
+try:
+    from .server import app
+except ImportError:  # Allows running directly from the scripts directory.
+    from server import app
+
+__all__ = ["app"]
@@ -4,17 +4,42 @@
 import logging
 import os
 import sys
+import time
 from datetime import datetime
 
-from dotenv import load_dotenv
-from supabase import create_client
-
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
 
+# Parsed configs keyed by (env_path, mtime), so a keep-alive loop pays one
+# stat() per tick instead of a full dotenv parse. Pure-env mode isn't cached;
+# it's already just four dict lookups.
+_config_cache: dict[tuple[str, int], dict[str, str]] = {}
+
+# A success within this window counts as fresh activity; re-pinging sooner
+# (e.g. overlapping timer fires or an embedding process calling main() in a
+# loop) would only add load without keeping the project any more alive.
+_FRESH_SECONDS = 30
+_last_ok_ts: float | None = None
+
+# Shared HTTP client, created on first ping. Reusing it lets httpx's
+# connection pool keep the TCP+TLS session warm across pings instead of
+# paying a fresh handshake per call in a long-running process.
+_http_client = None
+
+
+def _get_http_client():
+    """Return the shared httpx client, creating it on first use."""
+    global _http_client
+    if _http_client is None:
+        # Imported lazily so runs that fail config validation never pay for it
+        import httpx
+
+        _http_client = httpx.Client(timeout=10)
+    return _http_client
+
 
 def load_config(env_path: str | None = None) -> dict[str, str]:
     """Load Supabase credentials from environment or .env file.
@@ -28,13 +53,37 @@ def load_config(env_path: str | None = None) -> dict[str, str]:
     Raises:
         ValueError: If required credentials are missing.
     """
-    if env_path:
-        load_dotenv(env_path)
-
-    url = os.environ.get("SUPABASE_URL")
-    key = os.environ.get("SUPABASE_KEY")
-    email = os.environ.get("SUPABASE_EMAIL")
-    password = os.environ.get("SUPABASE_PASSWORD")
+    # Bind once: each os.environ attribute lookup costs more than a local
+    env = os.environ
+    url = env.get("SUPABASE_URL")
+    key = env.get("SUPABASE_KEY")
+    email = env.get("SUPABASE_EMAIL")
+    password = env.get("SUPABASE_PASSWORD")
+
+    cache_key = None
+    if not (url and key and email and password):
+        # Only consult the .env file when the environment is incomplete;
+        # load_dotenv never overrides set variables, so when everything is
+        # already present the parse would have been a no-op anyway
+        if env_path:
+            try:
+                cache_key = (env_path, os.stat(env_path).st_mtime_ns)
+            except OSError:
+                # Missing file: load_dotenv treats it as a no-op, so keep
+                # doing that and fall back to whatever is in the environment
+                cache_key = None
+            if cache_key is not None and cache_key in _config_cache:
+                return _config_cache[cache_key]
+
+            # Imported lazily; dotenv is only needed when a file path is given
+            from dotenv import load_dotenv
+
+            load_dotenv(env_path)
+
+        url = env.get("SUPABASE_URL")
+        key = env.get("SUPABASE_KEY")
+        email = env.get("SUPABASE_EMAIL")
+        password = env.get("SUPABASE_PASSWORD")
 
     if not url:
         raise ValueError("SUPABASE_URL is not set")
@@ -45,11 +94,18 @@ def load_config(env_path: str | None = None) -> dict[str, str]:
     if not password:
         raise ValueError("SUPABASE_PASSWORD is not set")
 
-    return {"url": url, "key": key, "email": email, "password": password}
+    config = {"url": url, "key": key, "email": email, "password": password}
+    if cache_key is not None:
+        _config_cache[cache_key] = config
+    return config
 
 
 def ping_supabase(url: str, key: str, email: str, password: str) -> bool:
-    """Connect to Supabase and sign in to generate activity.
+    """Sign in to Supabase to generate activity.
+
+    Talks to the auth endpoint directly with httpx rather than through the
+    supabase SDK; importing the SDK and its transitive clients took seconds
+    on a Pi just to fire this one request.
 
     Args:
         url: Supabase project URL.
@@ -61,8 +117,16 @@ def ping_supabase(url: str, key: str, email: str, password: str) -> bool:
         True if ping was successful, False otherwise.
     """
     try:
-        client = create_client(url, key)
-        client.auth.sign_in_with_password({"email": email, "password": password})
+        response = _get_http_client().post(
+            f"{url}/auth/v1/token?grant_type=password",
+            json={"email": email, "password": password},
+            headers={"apikey": key},
+        )
+        if response.status_code != 200:
+            logger.error(
+                f"Failed to ping Supabase: sign-in returned {response.status_code}"
+            )
+            return False
         return True
     except Exception as e:
         logger.error(f"Failed to ping Supabase: {e}")
@@ -78,6 +142,13 @@ def main(env_path: str | None = None) -> int:
     Returns:
         Exit code: 0 for success, 1 for failure.
     """
+    global _last_ok_ts
+
+    if _last_ok_ts is not None and time.monotonic() - _last_ok_ts < _FRESH_SECONDS:
+        logger.info("Skipping ping; last success was under "
+                    f"{_FRESH_SECONDS}s ago")
+        return 0
+
     try:
         config = load_config(env_path)
     except ValueError as e:
@@ -87,6 +158,7 @@ def main(env_path: str | None = None) -> int:
     timestamp = datetime.now().isoformat()
 
     if ping_supabase(config["url"], config["key"], config["email"], config["password"]):
+        _last_ok_ts = time.monotonic()
         logger.info(f"[{timestamp}] Supabase keep-alive ping successful")
         return 0
     else:
@@ -0,0 +1,20 @@
+"""Shared fixtures for the test suite."""
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def sample_env(tmp_path_factory):
+    """A pre-written .env file shared across the session.
+
+    The content is only ever read, so writing it once saves the per-test
+    directory creation and file writes of a function-scoped tmp_path.
+    """
+    env_file = tmp_path_factory.mktemp("config") / ".env"
+    env_file.write_text(
+        "SUPABASE_URL=https://file.supabase.co\n"
+        "SUPABASE_KEY=file-key-456\n"
+        "SUPABASE_EMAIL=file@example.com\n"
+        "SUPABASE_PASSWORD=file-password\n"
+    )
+    return env_file
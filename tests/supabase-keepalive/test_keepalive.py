@@ -2,9 +2,10 @@
 
 import importlib.util
 import os
+import re
 import sys
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import DEFAULT, patch
 
 import pytest
 
@@ -19,30 +20,97 @@ load_config = keepalive.load_config
 main = keepalive.main
 ping_supabase = keepalive.ping_supabase
 
+_CRED_VARS = (
+    "SUPABASE_URL",
+    "SUPABASE_KEY",
+    "SUPABASE_EMAIL",
+    "SUPABASE_PASSWORD",
+)
 
+# Compiled once; pytest.raises(match=...) accepts compiled patterns and then
+# skips re-compiling the expression on every call
+_MISSING = {var: re.compile(var) for var in _CRED_VARS}
+
+
+class _FakeResponse:
+    """Minimal stand-in for an httpx.Response."""
+
+    __slots__ = ("status_code",)
+
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+class _FakeHttpClient:
+    """Hand-rolled httpx.Client stub.
+
+    A MagicMock grows a child mock per attribute access; this records post()
+    calls in a plain list and costs a single small object per test.
+    """
+
+    __slots__ = ("_status_code", "_exc", "calls")
+
+    def __init__(self, status_code: int = 200, exc: Exception | None = None):
+        self._status_code = status_code
+        self._exc = exc
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        if self._exc is not None:
+            raise self._exc
+        return _FakeResponse(self._status_code)
+
+
+@pytest.fixture(autouse=True)
+def reset_cached_state():
+    """Each test starts with fresh module caches, so mocks don't leak."""
+    keepalive._http_client = None
+    keepalive._config_cache.clear()
+    keepalive._last_ok_ts = None
+    yield
+    keepalive._http_client = None
+    keepalive._config_cache.clear()
+    keepalive._last_ok_ts = None
+
+
+@pytest.mark.xdist_group("load-config")
 class TestLoadConfig:
     """Tests for loading configuration from environment or .env file."""
 
-    def test_loads_credentials_from_environment_variables(self):
+    def test_loads_credentials_from_environment_variables(self, monkeypatch):
         """Should load all credentials from environment."""
-        with patch.dict(
-            os.environ,
-            {
-                "SUPABASE_URL": "https://test.supabase.co",
-                "SUPABASE_KEY": "test-key-123",
-                "SUPABASE_EMAIL": "test@example.com",
-                "SUPABASE_PASSWORD": "test-password",
-            },
-        ):
-            config = load_config()
+        monkeypatch.setenv("SUPABASE_URL", "https://test.supabase.co")
+        monkeypatch.setenv("SUPABASE_KEY", "test-key-123")
+        monkeypatch.setenv("SUPABASE_EMAIL", "test@example.com")
+        monkeypatch.setenv("SUPABASE_PASSWORD", "test-password")
+
+        config = load_config()
 
         assert config["url"] == "https://test.supabase.co"
         assert config["key"] == "test-key-123"
         assert config["email"] == "test@example.com"
         assert config["password"] == "test-password"
 
-    def test_loads_credentials_from_env_file(self, tmp_path):
+    def test_loads_credentials_from_env_file(self, sample_env, monkeypatch):
         """Should load credentials from a .env file when path is provided."""
+        for var in _CRED_VARS:
+            monkeypatch.delenv(var, raising=False)
+
+        config = load_config(str(sample_env))
+
+        assert config["url"] == "https://file.supabase.co"
+        assert config["key"] == "file-key-456"
+        assert config["email"] == "file@example.com"
+        assert config["password"] == "file-password"
+
+    def test_memoizes_env_file_parse_between_calls(self, tmp_path, monkeypatch):
+        """Should only parse the .env file once while its mtime is unchanged."""
+        import dotenv
+
+        for var in _CRED_VARS:
+            monkeypatch.delenv(var, raising=False)
+
         env_file = tmp_path / ".env"
         env_file.write_text(
             "SUPABASE_URL=https://file.supabase.co\n"
@@ -51,81 +119,138 @@ class TestLoadConfig:
             "SUPABASE_PASSWORD=file-password\n"
         )
 
-        config = load_config(str(env_file))
+        with patch("dotenv.load_dotenv", wraps=dotenv.load_dotenv) as mock_load:
+            first = load_config(str(env_file))
+            second = load_config(str(env_file))
 
-        assert config["url"] == "https://file.supabase.co"
-        assert config["key"] == "file-key-456"
-        assert config["email"] == "file@example.com"
-        assert config["password"] == "file-password"
+        assert mock_load.call_count == 1
+        assert first == second
+
+    def test_reparses_env_file_when_mtime_changes(self, tmp_path, monkeypatch):
+        """Should re-read the .env file after its mtime changes."""
+        import dotenv
+
+        for var in _CRED_VARS:
+            monkeypatch.delenv(var, raising=False)
+
+        env_file = tmp_path / ".env"
+        env_file.write_text(
+            "SUPABASE_URL=https://file.supabase.co\n"
+            "SUPABASE_KEY=file-key-456\n"
+            "SUPABASE_EMAIL=file@example.com\n"
+            "SUPABASE_PASSWORD=file-password\n"
+        )
 
-    def test_raises_error_when_url_missing(self):
+        with patch("dotenv.load_dotenv", wraps=dotenv.load_dotenv) as mock_load:
+            load_config(str(env_file))
+            # Clear what the first parse exported, as a fresh process would
+            # see, so the changed file is actually consulted again
+            for var in _CRED_VARS:
+                monkeypatch.delenv(var, raising=False)
+            stat = os.stat(env_file)
+            os.utime(env_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            load_config(str(env_file))
+
+        assert mock_load.call_count == 2
+
+    def test_skips_file_when_env_already_set(self, monkeypatch):
+        """Should not touch the .env file when the environment is complete."""
+        monkeypatch.setenv("SUPABASE_URL", "https://env.supabase.co")
+        monkeypatch.setenv("SUPABASE_KEY", "env-key")
+        monkeypatch.setenv("SUPABASE_EMAIL", "env@example.com")
+        monkeypatch.setenv("SUPABASE_PASSWORD", "env-password")
+
+        with patch("dotenv.load_dotenv") as mock_load:
+            config = load_config("/nonexistent/.env")
+
+        assert mock_load.call_count == 0
+        assert config["url"] == "https://env.supabase.co"
+        assert config["key"] == "env-key"
+
+    def test_raises_error_when_url_missing(self, monkeypatch):
         """Should raise ValueError when SUPABASE_URL is not set."""
-        with patch.dict(os.environ, {
-            "SUPABASE_KEY": "key",
-            "SUPABASE_EMAIL": "test@example.com",
-            "SUPABASE_PASSWORD": "password",
-        }, clear=True):
-            with pytest.raises(ValueError, match="SUPABASE_URL"):
-                load_config()
-
-    def test_raises_error_when_key_missing(self):
+        monkeypatch.delenv("SUPABASE_URL", raising=False)
+        monkeypatch.setenv("SUPABASE_KEY", "key")
+        monkeypatch.setenv("SUPABASE_EMAIL", "test@example.com")
+        monkeypatch.setenv("SUPABASE_PASSWORD", "password")
+
+        with pytest.raises(ValueError, match=_MISSING["SUPABASE_URL"]):
+            load_config()
+
+    def test_raises_error_when_key_missing(self, monkeypatch):
         """Should raise ValueError when SUPABASE_KEY is not set."""
-        with patch.dict(os.environ, {
-            "SUPABASE_URL": "https://test.supabase.co",
-            "SUPABASE_EMAIL": "test@example.com",
-            "SUPABASE_PASSWORD": "password",
-        }, clear=True):
-            with pytest.raises(ValueError, match="SUPABASE_KEY"):
-                load_config()
-
-    def test_raises_error_when_email_missing(self):
+        monkeypatch.delenv("SUPABASE_KEY", raising=False)
+        monkeypatch.setenv("SUPABASE_URL", "https://test.supabase.co")
+        monkeypatch.setenv("SUPABASE_EMAIL", "test@example.com")
+        monkeypatch.setenv("SUPABASE_PASSWORD", "password")
+
+        with pytest.raises(ValueError, match=_MISSING["SUPABASE_KEY"]):
+            load_config()
+
+    def test_raises_error_when_email_missing(self, monkeypatch):
         """Should raise ValueError when SUPABASE_EMAIL is not set."""
-        with patch.dict(os.environ, {
-            "SUPABASE_URL": "https://test.supabase.co",
-            "SUPABASE_KEY": "key",
-            "SUPABASE_PASSWORD": "password",
-        }, clear=True):
-            with pytest.raises(ValueError, match="SUPABASE_EMAIL"):
-                load_config()
-
-    def test_raises_error_when_password_missing(self):
+        monkeypatch.delenv("SUPABASE_EMAIL", raising=False)
+        monkeypatch.setenv("SUPABASE_URL", "https://test.supabase.co")
+        monkeypatch.setenv("SUPABASE_KEY", "key")
+        monkeypatch.setenv("SUPABASE_PASSWORD", "password")
+
+        with pytest.raises(ValueError, match=_MISSING["SUPABASE_EMAIL"]):
+            load_config()
+
+    def test_raises_error_when_password_missing(self, monkeypatch):
         """Should raise ValueError when SUPABASE_PASSWORD is not set."""
-        with patch.dict(os.environ, {
-            "SUPABASE_URL": "https://test.supabase.co",
-            "SUPABASE_KEY": "key",
-            "SUPABASE_EMAIL": "test@example.com",
-        }, clear=True):
-            with pytest.raises(ValueError, match="SUPABASE_PASSWORD"):
-                load_config()
+        monkeypatch.delenv("SUPABASE_PASSWORD", raising=False)
+        monkeypatch.setenv("SUPABASE_URL", "https://test.supabase.co")
+        monkeypatch.setenv("SUPABASE_KEY", "key")
+        monkeypatch.setenv("SUPABASE_EMAIL", "test@example.com")
 
+        with pytest.raises(ValueError, match=_MISSING["SUPABASE_PASSWORD"]):
+            load_config()
 
+
+@pytest.mark.xdist_group("ping")
 class TestPingSupabase:
     """Tests for the Supabase ping functionality."""
 
     def test_returns_true_on_successful_sign_in(self):
         """Should return True when Supabase sign-in succeeds."""
-        mock_client = MagicMock()
+        fake_client = _FakeHttpClient(status_code=200)
 
-        with patch(
-            "keepalive.create_client", return_value=mock_client
-        ):
+        with patch("httpx.Client", return_value=fake_client):
             result = ping_supabase(
                 "https://test.supabase.co", "test-key",
                 "test@example.com", "password"
             )
 
         assert result is True
-        mock_client.auth.sign_in_with_password.assert_called_once_with({
-            "email": "test@example.com",
-            "password": "password",
-        })
+        assert fake_client.calls == [(
+            "https://test.supabase.co/auth/v1/token?grant_type=password",
+            {
+                "json": {"email": "test@example.com", "password": "password"},
+                "headers": {"apikey": "test-key"},
+            },
+        )]
+
+    def test_reuses_client_across_calls(self):
+        """Should construct the HTTP client once across repeated pings."""
+        fake_client = _FakeHttpClient(status_code=200)
+
+        with patch("httpx.Client", return_value=fake_client) as mock_client_cls:
+            for _ in range(5):
+                result = ping_supabase(
+                    "https://test.supabase.co", "test-key",
+                    "test@example.com", "password"
+                )
+                assert result is True
+
+        assert mock_client_cls.call_count == 1
+        assert len(fake_client.calls) == 5
 
     def test_returns_false_on_connection_error(self):
         """Should return False when Supabase connection fails."""
-        with patch(
-            "keepalive.create_client",
-            side_effect=Exception("Connection failed"),
-        ):
+        fake_client = _FakeHttpClient(exc=Exception("Connection failed"))
+
+        with patch("httpx.Client", return_value=fake_client):
             result = ping_supabase(
                 "https://test.supabase.co", "test-key",
                 "test@example.com", "password"
@@ -135,14 +260,9 @@ class TestPingSupabase:
 
     def test_returns_false_on_auth_error(self):
         """Should return False when authentication fails."""
-        mock_client = MagicMock()
-        mock_client.auth.sign_in_with_password.side_effect = Exception(
-            "Invalid credentials"
-        )
+        fake_client = _FakeHttpClient(status_code=400)
 
-        with patch(
-            "keepalive.create_client", return_value=mock_client
-        ):
+        with patch("httpx.Client", return_value=fake_client):
             result = ping_supabase(
                 "https://test.supabase.co", "test-key",
                 "test@example.com", "password"
@@ -151,75 +271,68 @@ class TestPingSupabase:
         assert result is False
 
 
+@pytest.mark.xdist_group("main")
 class TestMain:
     """Tests for the main entry point."""
 
-    def test_returns_zero_on_success(self):
-        """Should return exit code 0 when ping succeeds."""
-        with (
-            patch(
-                "keepalive.load_config",
-                return_value={
-                    "url": "https://test.supabase.co",
-                    "key": "test-key",
-                    "email": "test@example.com",
-                    "password": "password",
-                },
-            ),
-            patch("keepalive.ping_supabase", return_value=True),
-        ):
-            result = main()
-
-        assert result == 0
-
-    def test_returns_one_on_ping_failure(self):
-        """Should return exit code 1 when ping fails."""
-        with (
-            patch(
-                "keepalive.load_config",
-                return_value={
-                    "url": "https://test.supabase.co",
-                    "key": "test-key",
-                    "email": "test@example.com",
-                    "password": "password",
-                },
+    @pytest.mark.parametrize(
+        ("ping_result", "config_error", "expected"),
+        [
+            pytest.param(True, None, 0, id="ping-success"),
+            pytest.param(False, None, 1, id="ping-failure"),
+            pytest.param(
+                None, ValueError("Missing credentials"), 1, id="config-error"
             ),
-            patch("keepalive.ping_supabase", return_value=False),
-        ):
-            result = main()
+        ],
+    )
+    @patch.multiple("keepalive", load_config=DEFAULT, ping_supabase=DEFAULT)
+    def test_main_exit_code(self, ping_result, config_error, expected, **mocks):
+        """main() should map config and ping outcomes to exit codes."""
+        if config_error is not None:
+            mocks["load_config"].side_effect = config_error
+        else:
+            mocks["load_config"].return_value = {
+                "url": "https://test.supabase.co",
+                "key": "test-key",
+                "email": "test@example.com",
+                "password": "password",
+            }
+        mocks["ping_supabase"].return_value = ping_result
 
-        assert result == 1
+        result = main()
 
-    def test_returns_one_on_config_error(self):
-        """Should return exit code 1 when config loading fails."""
-        with patch(
-            "keepalive.load_config",
-            side_effect=ValueError("Missing credentials"),
-        ):
-            result = main()
+        assert result == expected
 
-        assert result == 1
+    @patch.multiple("keepalive", load_config=DEFAULT, ping_supabase=DEFAULT)
+    def test_skips_ping_within_freshness_window(self, **mocks):
+        """Should not re-ping while the last success is still fresh."""
+        mocks["load_config"].return_value = {
+            "url": "https://test.supabase.co",
+            "key": "test-key",
+            "email": "test@example.com",
+            "password": "password",
+        }
+        mocks["ping_supabase"].return_value = True
+
+        assert main() == 0
+        assert main() == 0
 
-    def test_passes_env_path_to_load_config(self, tmp_path):
+        assert mocks["ping_supabase"].call_count == 1
+
+    @patch.multiple("keepalive", load_config=DEFAULT, ping_supabase=DEFAULT)
+    def test_passes_env_path_to_load_config(self, sample_env, **mocks):
         """Should pass env_path argument to load_config."""
-        env_file = tmp_path / ".env"
-        env_file.write_text(
-            "SUPABASE_URL=https://test.supabase.co\n"
-            "SUPABASE_KEY=test-key\n"
-            "SUPABASE_EMAIL=test@example.com\n"
-            "SUPABASE_PASSWORD=password\n"
-        )
+        mocks["load_config"].return_value = {
+            "url": "https://test.supabase.co",
+            "key": "test-key",
+            "email": "test@example.com",
+            "password": "password",
+        }
+        mocks["ping_supabase"].return_value = True
 
-        with (
-            patch("keepalive.load_config") as mock_load,
-            patch("keepalive.ping_supabase", return_value=True),
-        ):
-            mock_load.return_value = {
-                "url": "https://test.supabase.co",
-                "key": "test-key",
-                "email": "test@example.com",
-                "password": "password",
-            }
-            main(str(env_file))
+        main(str(sample_env))
 
-        mock_load.assert_called_once_with(str(env_file))
+        # Cheaper than assert_called_once_with: plain comparisons, no
+        # formatted-diff message building on the success path
+        assert mocks["load_config"].call_count == 1
+        assert mocks["load_config"].call_args == ((str(sample_env),), {})